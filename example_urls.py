@@ -5,9 +5,8 @@ Execute este arquivo para testar o scraper com diferentes URLs
 
 import asyncio
 from scraper import WebScraper
-import json
+import orjson
 from datetime import datetime
-from dataclasses import asdict
 
 
 async def main():
@@ -25,20 +24,20 @@ async def main():
     print("=" * 80)
     
     # Configurar o scraper com seus próprios parâmetros
-    scraper = WebScraper(
+    # O 'async with' mantém uma única sessão HTTP (conexões keep-alive reutilizadas)
+    async with WebScraper(
         requests_per_second=2.0,  # Máximo de 2 requisições por segundo
         timeout=10,                # Timeout de 10 segundos
         max_retries=3              # Máximo de 3 tentativas por URL
-    )
-    
-    print(f"\n📊 Iniciando scraping de {len(urls)} URLs...")
-    print(f"⏱️  Rate limit: 2 requisições/segundo")
-    print(f"🔄 Máximo de tentativas: 3")
-    print(f"⏳ Timeout: 10 segundos\n")
-    
-    # Executar o scraping
-    articles = await scraper.scrape_articles(urls)
-    
+    ) as scraper:
+        print(f"\n📊 Iniciando scraping de {len(urls)} URLs...")
+        print(f"⏱️  Rate limit: 2 requisições/segundo")
+        print(f"🔄 Máximo de tentativas: 3")
+        print(f"⏳ Timeout: 10 segundos\n")
+
+        # Executar o scraping
+        articles = await scraper.scrape_articles(urls)
+
     # Exibir resultados
     print("\n" + "=" * 80)
     print("RESULTADOS DO SCRAPING")
@@ -74,12 +73,12 @@ async def main():
     
     output = {
         "timestamp": datetime.utcnow().isoformat(),
-        "articles": [asdict(a) for a in articles],
+        "articles": [a.to_dict() for a in articles],
         "statistics": stats_dict
     }
     
-    with open("scraping_results.json", "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    with open("scraping_results.json", "wb") as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
     
     print(f"\n✅ Resultados salvos em 'scraping_results.json'")
     print("\n💡 Dica: Abra o arquivo 'scraping_results.json' para ver os dados em formato JSON")
@@ -5,13 +5,16 @@ Exemplo de automação de dados com boas práticas de performance e respeito a r
 
 import asyncio
 import aiohttp
-from bs4 import BeautifulSoup
-import json
+from yarl import URL
+from selectolax.parser import HTMLParser
+import orjson
 from datetime import datetime
 from typing import List, Dict, Optional
 import logging
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
+import random
+import re
 import time
 
 # Configuração de logging
@@ -22,6 +25,30 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Fast path de extração: regexes pré-compiladas sobre o início do documento
+# (título e metas ficam no <head>, nos primeiros KB). O parse completo em C
+# só roda quando o regex não encontra um título.
+_HEAD_SCAN_BYTES = 65536
+_H1_RE = re.compile(rb'<h1[^>]*>(.*?)</h1>', re.I | re.S)
+_TITLE_RE = re.compile(rb'<title[^>]*>([^<]+)</title>', re.I)
+_META_AUTHOR_RE = re.compile(
+    rb'<meta[^>]+name=["\']author["\'][^>]+content=["\']([^"\']+)', re.I
+)
+_META_DESCRIPTION_RE = re.compile(
+    rb'<meta[^>]+name=["\']description["\'][^>]+content=["\']([^"\']+)', re.I
+)
+_META_PUBLISHED_RE = re.compile(
+    rb'<meta[^>]+property=["\']article:published_time["\'][^>]+content=["\']([^"\']+)', re.I
+)
+_TAG_RE = re.compile(rb'<[^>]+>')
+
+
+def _meta_content(pattern: "re.Pattern[bytes]", head: bytes) -> Optional[str]:
+    """Extrair o atributo content de um meta via regex, se presente"""
+    match = pattern.search(head)
+    return match.group(1).decode('utf-8', 'replace') if match else None
+
+
 class ScraperStatus(Enum):
     """Status de scraping"""
     PENDING = "pending"
@@ -30,7 +57,7 @@ class ScraperStatus(Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True)
 class Article:
     """Modelo de artigo extraído"""
     title: str
@@ -39,13 +66,17 @@ class Article:
     published_date: Optional[str] = None
     summary: Optional[str] = None
     scraped_at: str = None
-    
+
     def __post_init__(self):
         if self.scraped_at is None:
             self.scraped_at = datetime.utcnow().isoformat()
 
+    def to_dict(self) -> Dict:
+        """Cópia rasa dos campos (instâncias com slots não têm __dict__)"""
+        return {s: getattr(self, s) for s in self.__slots__}
+
 
-@dataclass
+@dataclass(slots=True)
 class ScraperStats:
     """Estatísticas de scraping"""
     total_items: int = 0
@@ -55,21 +86,41 @@ class ScraperStats:
     items_per_second: float = 0.0
     status: ScraperStatus = ScraperStatus.PENDING
 
+    def to_dict(self) -> Dict:
+        """Cópia rasa dos campos (instâncias com slots não têm __dict__)"""
+        return {s: getattr(self, s) for s in self.__slots__}
+
 
 class RateLimiter:
-    """Limitador de taxa de requisições"""
-    
-    def __init__(self, requests_per_second: float = 1.0):
+    """Limitador de taxa de requisições (token bucket)
+
+    Permite rajadas de até `capacity` requisições em paralelo enquanto
+    mantém a taxa média limitada a `requests_per_second`.
+    """
+
+    def __init__(self, requests_per_second: float = 1.0, capacity: Optional[float] = None):
         self.requests_per_second = requests_per_second
-        self.min_interval = 1.0 / requests_per_second
-        self.last_request_time = 0.0
-    
+        # Por padrão a capacidade de rajada acompanha a taxa (mínimo de 1 token)
+        self.capacity = max(1.0, capacity if capacity is not None else requests_per_second)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
     async def wait(self):
-        """Aguardar antes de fazer próxima requisição"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_interval:
-            await asyncio.sleep(self.min_interval - elapsed)
-        self.last_request_time = time.time()
+        """Aguardar até haver um token disponível"""
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.last_refill) * self.requests_per_second
+                )
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                sleep_time = (1 - self.tokens) / self.requests_per_second
+            await asyncio.sleep(sleep_time)
 
 
 class WebScraper:
@@ -79,46 +130,131 @@ class WebScraper:
         self,
         requests_per_second: float = 2.0,
         timeout: int = 10,
-        max_retries: int = 3
+        max_retries: int = 3,
+        capacity: Optional[float] = None,
+        max_concurrency: int = 20,
+        limit_per_host: int = 4
     ):
-        self.rate_limiter = RateLimiter(requests_per_second)
+        self.requests_per_second = requests_per_second
+        self.capacity = capacity
+        # Um token bucket por host: hosts lentos ou limitados não atrasam
+        # requisições para os demais
+        self._limiters: Dict[str, RateLimiter] = {}
         self.timeout = aiohttp.ClientTimeout(total=timeout)
         self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        # Criado sob demanda dentro do event loop em execução
+        self._sem: Optional[asyncio.Semaphore] = None
         self.stats = ScraperStats()
         self.user_agent = (
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
             "AppleWebKit/537.36 (KHTML, like Gecko) "
             "Chrome/91.0.4472.124 Safari/537.36"
         )
-    
-    async def fetch_url(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
-        """Fazer requisição HTTP com retry"""
-        headers = {"User-Agent": self.user_agent}
-        
+        # Montado uma vez; a sessão aplica em todas as requisições.
+        # Accept-Encoding corta 3-5x os bytes transferidos em HTML típico;
+        # o aiohttp descomprime automaticamente (brotli requer o pacote
+        # 'brotli' instalado)
+        self._headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip, br",
+        }
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "WebScraper":
+        await self._ensure_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Criar a sessão compartilhada na primeira utilização"""
+        if self._session is None or self._session.closed:
+            try:
+                # DNS totalmente assíncrono via c-ares, sem pular para o
+                # executor de threads a cada lookup
+                resolver = aiohttp.AsyncResolver()
+            except RuntimeError:
+                # aiodns não instalado; aiohttp usa o resolver padrão
+                resolver = None
+            connector = aiohttp.TCPConnector(
+                resolver=resolver,
+                limit=self.max_concurrency,
+                limit_per_host=self.limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=connector,
+                headers=self._headers,
+                auto_decompress=True
+            )
+        return self._session
+
+    async def close(self):
+        """Fechar a sessão compartilhada (use quando não estiver com 'async with')"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _limiter_for(self, url: str) -> RateLimiter:
+        """Obter (ou criar) o rate limiter do host da URL"""
+        host = URL(url).host or ""
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = RateLimiter(
+                self.requests_per_second, self.capacity
+            )
+        return limiter
+
+    async def fetch_url(self, url: str) -> Optional[bytes]:
+        """Fazer requisição HTTP com retry, retornando o corpo em bytes"""
+        session = await self._ensure_session()
+        rate_limiter = self._limiter_for(url)
+
         for attempt in range(self.max_retries):
+            retry_after = None
             try:
-                await self.rate_limiter.wait()
-                
+                await rate_limiter.wait()
+
                 async with session.get(
                     url,
-                    headers=headers,
                     timeout=self.timeout,
                     ssl=False
                 ) as response:
                     if response.status == 200:
                         logger.info(f"✓ Fetched: {url}")
-                        return await response.text()
+                        # Bytes crus: o parser em C detecta o charset sozinho,
+                        # evitando um decode Python do buffer inteiro
+                        return await response.read()
+                    elif 400 <= response.status < 500 and response.status not in (408, 425, 429):
+                        # Erro 4xx terminal (ex: 404): repetir não vai ajudar
+                        logger.warning(f"Status {response.status} (não recuperável): {url}")
+                        return None
                     else:
                         logger.warning(f"Status {response.status}: {url}")
-                        
+                        retry_after = response.headers.get("Retry-After")
+
             except asyncio.TimeoutError:
                 logger.warning(f"Timeout (attempt {attempt + 1}/{self.max_retries}): {url}")
             except aiohttp.ClientError as e:
                 logger.warning(f"Error (attempt {attempt + 1}/{self.max_retries}): {url} - {str(e)}")
-            
+
             if attempt < self.max_retries - 1:
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
-        
+                # Backoff exponencial com jitter total, evitando que tentativas
+                # simultâneas acordem todas no mesmo instante
+                delay = random.uniform(0, min(30.0, 2 ** attempt))
+                if retry_after is not None:
+                    try:
+                        delay = max(delay, float(retry_after))
+                    except ValueError:
+                        pass
+                await asyncio.sleep(delay)
+
         logger.error(f"✗ Failed after {self.max_retries} attempts: {url}")
         return None
     
@@ -126,63 +262,144 @@ class WebScraper:
         """Scraper múltiplas URLs em paralelo"""
         self.stats.status = ScraperStatus.RUNNING
         self.stats.total_items = len(urls)
-        start_time = time.time()
+        start_time = time.monotonic()
         
         articles = []
-        
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            tasks = [self._scrape_single_url(session, url) for url in urls]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for result in results:
-                if isinstance(result, Article):
-                    articles.append(result)
-                    self.stats.successful_items += 1
-                elif isinstance(result, Exception):
-                    self.stats.failed_items += 1
-                    logger.error(f"Exception during scraping: {result}")
-                else:
-                    self.stats.failed_items += 1
-        
-        # Calcular estatísticas
-        elapsed_time = time.time() - start_time
+
+        # Um único timestamp para o lote inteiro, em vez de um
+        # datetime.utcnow().isoformat() por artigo
+        batch_scraped_at = datetime.utcnow().isoformat()
+
+        await self._ensure_session()
+        tasks = [self._scrape_single_url(url, scraped_at=batch_scraped_at) for url in urls]
+
+        # Processar cada resultado assim que concluir, liberando os buffers
+        # da tarefa em vez de segurar todos até o gather terminar
+        for future in asyncio.as_completed(tasks):
+            try:
+                result = await future
+            except Exception as e:
+                logger.error(f"Exception during scraping: {e}")
+                continue
+            if result is not None:
+                articles.append(result)
+
+        # Calcular estatísticas (contagem única ao final, sem incrementos
+        # e isinstance por iteração)
+        self.stats.successful_items = len(articles)
+        self.stats.failed_items = len(urls) - len(articles)
+        elapsed_time = time.monotonic() - start_time
         self.stats.total_time = elapsed_time
         self.stats.items_per_second = self.stats.successful_items / elapsed_time if elapsed_time > 0 else 0
         self.stats.status = ScraperStatus.COMPLETED
         
         return articles
-    
-    async def _scrape_single_url(self, session: aiohttp.ClientSession, url: str) -> Optional[Article]:
+
+    async def scrape_to_jsonl(
+        self,
+        urls: List[str],
+        output_path: str = "scraping_results.jsonl"
+    ) -> int:
+        """Scraper múltiplas URLs gravando cada artigo em JSONL ao concluir
+
+        Ao contrário de scrape_articles, não acumula a lista inteira em
+        memória: cada artigo vira uma linha no arquivo assim que fica pronto,
+        então o conjunto residente fica limitado a ~max_concurrency páginas.
+        Retorna o número de artigos gravados.
+        """
+        self.stats.status = ScraperStatus.RUNNING
+        self.stats.total_items = len(urls)
+        start_time = time.monotonic()
+
+        written = 0
+
+        # Um único timestamp para o lote inteiro, em vez de um
+        # datetime.utcnow().isoformat() por artigo
+        batch_scraped_at = datetime.utcnow().isoformat()
+
+        await self._ensure_session()
+        tasks = [self._scrape_single_url(url, scraped_at=batch_scraped_at) for url in urls]
+
+        with open(output_path, "ab") as f:
+            for future in asyncio.as_completed(tasks):
+                try:
+                    article = await future
+                except Exception as e:
+                    logger.error(f"Exception during scraping: {e}")
+                    continue
+                if article is not None:
+                    f.write(orjson.dumps(article.to_dict()) + b"\n")
+                    written += 1
+
+        self.stats.successful_items = written
+        self.stats.failed_items = len(urls) - written
+
+        elapsed_time = time.monotonic() - start_time
+        self.stats.total_time = elapsed_time
+        self.stats.items_per_second = self.stats.successful_items / elapsed_time if elapsed_time > 0 else 0
+        self.stats.status = ScraperStatus.COMPLETED
+
+        return written
+
+    async def _scrape_single_url(self, url: str, scraped_at: Optional[str] = None) -> Optional[Article]:
         """Scraper uma URL individual"""
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+
         try:
-            html = await self.fetch_url(session, url)
+            async with self._sem:
+                html = await self.fetch_url(url)
             if not html:
                 return None
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Extrair título
-            title_tag = soup.find('h1') or soup.find('title')
-            title = title_tag.get_text(strip=True) if title_tag else "N/A"
-            
-            # Extrair autor (exemplo genérico)
-            author_tag = soup.find('meta', {'name': 'author'})
-            author = author_tag.get('content') if author_tag else None
-            
-            # Extrair data de publicação
-            date_tag = soup.find('meta', {'property': 'article:published_time'})
-            published_date = date_tag.get('content') if date_tag else None
-            
-            # Extrair resumo/descrição
-            summary_tag = soup.find('meta', {'name': 'description'})
-            summary = summary_tag.get('content') if summary_tag else None
+
+            head = html[:_HEAD_SCAN_BYTES]
+            title_match = _H1_RE.search(head) or _TITLE_RE.search(head)
+            if title_match is not None:
+                # Fast path: tudo que interessa apareceu no início do
+                # documento, sem necessidade de montar a árvore. O <h1> pode
+                # conter tags inline e quebras de linha; remover as tags e
+                # normalizar o espaço em branco num único split/join
+                raw_title = _TAG_RE.sub(b'', title_match.group(1))
+                title = ' '.join(raw_title.decode('utf-8', 'replace').split()) or "N/A"
+                author = _meta_content(_META_AUTHOR_RE, head)
+                published_date = _meta_content(_META_PUBLISHED_RE, head)
+                summary = _meta_content(_META_DESCRIPTION_RE, head)
+            else:
+                tree = HTMLParser(html)
+
+                # Uma única descida na árvore cobre título e metas: o seletor
+                # em união substitui as quatro buscas independentes no DOM
+                h1_text = None
+                title_text = None
+                metas = {}
+                for node in tree.css(
+                    'h1, title, meta[name="author"], meta[name="description"], '
+                    'meta[property="article:published_time"]'
+                ):
+                    tag = node.tag
+                    if tag == 'h1':
+                        if h1_text is None:
+                            h1_text = node.text(strip=True)
+                    elif tag == 'title':
+                        if title_text is None:
+                            title_text = node.text(strip=True)
+                    else:
+                        attrs = node.attributes
+                        key = attrs.get('name') or attrs.get('property')
+                        metas.setdefault(key, attrs.get('content'))
+
+                title = h1_text or title_text or "N/A"
+                author = metas.get('author')
+                published_date = metas.get('article:published_time')
+                summary = metas.get('description')
             
             article = Article(
                 title=title,
                 url=url,
                 author=author,
                 published_date=published_date,
-                summary=summary
+                summary=summary,
+                scraped_at=scraped_at
             )
             
             return article
@@ -193,7 +410,9 @@ class WebScraper:
     
     def get_stats(self) -> Dict:
         """Obter estatísticas de scraping"""
-        return asdict(self.stats)
+        # Cópia rasa: todos os campos são primitivos, não precisa do
+        # deep-copy recursivo de dataclasses.asdict
+        return self.stats.to_dict()
 
 
 # ============================================================================
@@ -214,16 +433,15 @@ async def main():
     print("WEB SCRAPER PROFISSIONAL - EXEMPLO DE USO")
     print("=" * 80)
     
-    # Criar scraper
-    scraper = WebScraper(requests_per_second=2.0, timeout=10, max_retries=3)
-    
-    print(f"\n📊 Iniciando scraping de {len(urls)} URLs...")
-    print(f"⏱️  Rate limit: 2 requisições/segundo")
-    print(f"🔄 Máximo de tentativas: 3\n")
-    
-    # Executar scraping
-    articles = await scraper.scrape_articles(urls)
-    
+    # Criar scraper (a sessão HTTP é compartilhada enquanto o 'async with' durar)
+    async with WebScraper(requests_per_second=2.0, timeout=10, max_retries=3) as scraper:
+        print(f"\n📊 Iniciando scraping de {len(urls)} URLs...")
+        print(f"⏱️  Rate limit: 2 requisições/segundo")
+        print(f"🔄 Máximo de tentativas: 3\n")
+
+        # Executar scraping
+        articles = await scraper.scrape_articles(urls)
+
     # Exibir resultados
     print("\n" + "=" * 80)
     print("RESULTADOS")
@@ -256,12 +474,12 @@ async def main():
     
     output = {
         "timestamp": datetime.utcnow().isoformat(),
-        "articles": [asdict(a) for a in articles],
+        "articles": [a.to_dict() for a in articles],
         "statistics": stats_dict
     }
     
-    with open("scraping_results.json", "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    with open("scraping_results.json", "wb") as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
     
     print(f"\n✅ Resultados salvos em 'scraping_results.json'")
 
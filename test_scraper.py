@@ -3,39 +3,52 @@ Testes unitários para o Web Scraper
 Verifica se todas as funcionalidades estão funcionando corretamente
 """
 
-import asyncio
 import unittest
 from scraper import WebScraper, RateLimiter, Article, ScraperStatus
 from dataclasses import asdict
 import time
 
 
-class TestRateLimiter(unittest.TestCase):
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
     """Testes para a classe RateLimiter"""
-    
+
     def test_rate_limiter_initialization(self):
         """Testa se o RateLimiter é inicializado corretamente"""
         limiter = RateLimiter(requests_per_second=2.0)
         self.assertEqual(limiter.requests_per_second, 2.0)
-        self.assertEqual(limiter.min_interval, 0.5)
-    
-    def test_rate_limiter_wait(self):
-        """Testa se o RateLimiter aguarda corretamente"""
-        async def test():
-            limiter = RateLimiter(requests_per_second=2.0)
-            start = time.time()
-            await limiter.wait()
-            await limiter.wait()
-            elapsed = time.time() - start
-            # Deve ter esperado pelo menos 0.5 segundos
-            self.assertGreaterEqual(elapsed, 0.4)
-        
-        asyncio.run(test())
+        self.assertEqual(limiter.capacity, 2.0)
+        self.assertEqual(limiter.tokens, 2.0)
+
+    def test_rate_limiter_custom_capacity(self):
+        """Testa se a capacidade de rajada pode ser customizada"""
+        limiter = RateLimiter(requests_per_second=2.0, capacity=5.0)
+        self.assertEqual(limiter.capacity, 5.0)
+        self.assertEqual(limiter.tokens, 5.0)
+
+    async def test_rate_limiter_burst(self):
+        """Testa se rajadas até a capacidade passam sem espera"""
+        limiter = RateLimiter(requests_per_second=2.0, capacity=2.0)
+        start = time.monotonic()
+        await limiter.wait()
+        await limiter.wait()
+        elapsed = time.monotonic() - start
+        # Duas requisições cabem na rajada, não deve haver espera
+        self.assertLess(elapsed, 0.2)
+
+    async def test_rate_limiter_wait(self):
+        """Testa se o RateLimiter aguarda após esgotar os tokens"""
+        limiter = RateLimiter(requests_per_second=2.0, capacity=1.0)
+        start = time.monotonic()
+        await limiter.wait()
+        await limiter.wait()
+        elapsed = time.monotonic() - start
+        # Deve ter esperado pelo menos 0.5 segundos
+        self.assertGreaterEqual(elapsed, 0.4)
 
 
 class TestArticle(unittest.TestCase):
     """Testes para a classe Article"""
-    
+
     def test_article_creation(self):
         """Testa se um Article é criado corretamente"""
         article = Article(
@@ -47,7 +60,7 @@ class TestArticle(unittest.TestCase):
         self.assertEqual(article.url, "https://example.com")
         self.assertEqual(article.author, "Test Author")
         self.assertIsNotNone(article.scraped_at)
-    
+
     def test_article_to_dict(self):
         """Testa se um Article pode ser convertido para dicionário"""
         article = Article(
@@ -60,9 +73,9 @@ class TestArticle(unittest.TestCase):
         self.assertEqual(article_dict['url'], "https://example.com")
 
 
-class TestWebScraper(unittest.TestCase):
+class TestWebScraper(unittest.IsolatedAsyncioTestCase):
     """Testes para a classe WebScraper"""
-    
+
     def test_scraper_initialization(self):
         """Testa se o WebScraper é inicializado corretamente"""
         scraper = WebScraper(
@@ -70,10 +83,20 @@ class TestWebScraper(unittest.TestCase):
             timeout=10,
             max_retries=3
         )
-        self.assertEqual(scraper.rate_limiter.requests_per_second, 2.0)
+        self.assertEqual(scraper.requests_per_second, 2.0)
         self.assertEqual(scraper.timeout.total, 10)
         self.assertEqual(scraper.max_retries, 3)
-    
+
+    def test_scraper_per_host_limiters(self):
+        """Testa se cada host recebe seu próprio rate limiter"""
+        scraper = WebScraper(requests_per_second=2.0)
+        limiter_a = scraper._limiter_for("https://a.example.com/page")
+        limiter_b = scraper._limiter_for("https://b.example.com/page")
+        self.assertIsNot(limiter_a, limiter_b)
+        # A mesma URL (host) deve reutilizar o mesmo limiter
+        self.assertIs(limiter_a, scraper._limiter_for("https://a.example.com/other"))
+        self.assertEqual(limiter_a.requests_per_second, 2.0)
+
     def test_scraper_stats_initialization(self):
         """Testa se as estatísticas são inicializadas corretamente"""
         scraper = WebScraper()
@@ -82,39 +105,43 @@ class TestWebScraper(unittest.TestCase):
         self.assertEqual(stats['successful_items'], 0)
         self.assertEqual(stats['failed_items'], 0)
         self.assertEqual(stats['status'].value, 'pending')
-    
-    def test_scraper_with_empty_urls(self):
+
+    async def test_scrape_to_jsonl_with_empty_urls(self):
+        """Testa o modo streaming JSONL com uma lista vazia de URLs"""
+        import os
+        import tempfile
+        path = os.path.join(tempfile.mkdtemp(), "out.jsonl")
+        async with WebScraper() as scraper:
+            written = await scraper.scrape_to_jsonl([], output_path=path)
+            self.assertEqual(written, 0)
+            self.assertTrue(os.path.exists(path))
+
+    async def test_scraper_with_empty_urls(self):
         """Testa o scraper com uma lista vazia de URLs"""
-        async def test():
-            scraper = WebScraper()
+        async with WebScraper() as scraper:
             articles = await scraper.scrape_articles([])
             self.assertEqual(len(articles), 0)
             stats = scraper.get_stats()
             self.assertEqual(stats['total_items'], 0)
-        
-        asyncio.run(test())
 
 
-class TestIntegration(unittest.TestCase):
+class TestIntegration(unittest.IsolatedAsyncioTestCase):
     """Testes de integração"""
-    
-    def test_scraper_with_valid_url(self):
+
+    async def test_scraper_with_valid_url(self):
         """Testa o scraper com uma URL válida"""
-        async def test():
-            scraper = WebScraper(
-                requests_per_second=1.0,
-                timeout=10,
-                max_retries=2
-            )
+        async with WebScraper(
+            requests_per_second=1.0,
+            timeout=10,
+            max_retries=2
+        ) as scraper:
             # Usar uma URL que é conhecida por ser estável
             urls = ["https://example.com"]
             articles = await scraper.scrape_articles(urls)
-            
+
             stats = scraper.get_stats()
             self.assertEqual(stats['total_items'], 1)
             self.assertGreaterEqual(stats['successful_items'] + stats['failed_items'], 1)
-        
-        asyncio.run(test())
 
 
 def run_tests():
@@ -122,21 +149,21 @@ def run_tests():
     print("=" * 80)
     print("EXECUTANDO TESTES DO WEB SCRAPER")
     print("=" * 80)
-    
+
     # Criar suite de testes
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
-    
+
     # Adicionar testes
     suite.addTests(loader.loadTestsFromTestCase(TestRateLimiter))
     suite.addTests(loader.loadTestsFromTestCase(TestArticle))
     suite.addTests(loader.loadTestsFromTestCase(TestWebScraper))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
-    
+
     # Executar testes
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
-    
+
     print("\n" + "=" * 80)
     if result.wasSuccessful():
         print("✅ TODOS OS TESTES PASSARAM COM SUCESSO!")
@@ -145,7 +172,7 @@ def run_tests():
         print(f"Falhas: {len(result.failures)}")
         print(f"Erros: {len(result.errors)}")
     print("=" * 80)
-    
+
     return result.wasSuccessful()
 
 